@@ -1,18 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.database import get_session
 from app.models import User
+from app.schemas.posts import PostSchema
 from app.schemas.auth import (
     UserCreateSchema,
     UserSchema,
     UserCredentialsSchema,
     TokenPairSchema,
     RefreshTokenSchema,
-    AccessTokenSchema,
 )
-from app.services.auth import create_jwt_token_pair, refresh_access_token
+from app.services.auth import create_jwt_token_pair, refresh_access_token, revoke_refresh_token
+from app.services.posts import get_user_posts, USER_POSTS_PAGE_MAX_SIZE
 from app.services.users import create_user, get_user_by_credentials, get_current_user
 from app.services.celery_tasks.celery import some_task
 
@@ -52,12 +53,32 @@ async def get_tokens(user_data: UserCredentialsSchema, session: Session = Depend
     return create_jwt_token_pair(user_id=user.id)
 
 
-@router.post("/token/refresh", response_model=AccessTokenSchema)
+@router.post("/token/refresh", response_model=TokenPairSchema)
 def refresh_token(token: RefreshTokenSchema):
-    """Получение нового access token через refresh token"""
-    return AccessTokenSchema(access_token=refresh_access_token(token.refresh_token))
+    """
+    Получение новой пары JWT через refresh token.
+    Переданный refresh token после этого становится недействительным.
+    """
+    return refresh_access_token(token.refresh_token)
+
+
+@router.post("/logout", status_code=204)
+def logout(token: RefreshTokenSchema):
+    """Отзыв refresh token"""
+    revoke_refresh_token(token.refresh_token)
 
 
 @router.get("/me", response_model=UserSchema)
 def get_current_user_view(current_user: User = Depends(get_current_user)):
     return current_user
+
+
+@router.get("/me/posts", response_model=list[PostSchema])
+def get_current_user_posts_view(
+    before_id: int | None = None,
+    limit: int = Query(20, ge=1, le=USER_POSTS_PAGE_MAX_SIZE),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session, use_cache=True),
+):
+    """Получение постов текущего пользователя от новых к старым"""
+    return get_user_posts(session, current_user.id, before_id, limit)
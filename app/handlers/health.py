@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+
+from app.services.warmup import is_ready
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+def liveness_view():
+    """Проверка, что процесс запущен и отвечает"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def readiness_view():
+    """Проверка готовности воркера принимать трафик. До завершения прогрева возвращает 503"""
+    if not is_ready():
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ok"}
@@ -2,21 +2,22 @@ from fastapi import APIRouter, Depends
 
 from app.database import get_session
 from app.schemas.posts import PostSchema, CreatePostSchema
-from app.services.posts import create_post, get_posts
+from app.services.posts import create_post, get_posts_list
 from app.services.users import get_current_user
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
 @router.get("", response_model=list[PostSchema])
-def get_all_posts_view(session=Depends(get_session, use_cache=True)):
+def get_all_posts_view(summary: bool = False, session=Depends(get_session, use_cache=True)):
     """
     Получение всех постов.
 
+    :param summary: Если True, содержимое постов возвращается в сокращенном виде.
     :param session: Сессия базы данных, полученная с помощью зависимости.
     :return: Список всех постов, представленных в формате PostSchema.
     """
-    return get_posts(session)
+    return get_posts_list(session, summary=summary)
 
 
 @router.post("", response_model=PostSchema)
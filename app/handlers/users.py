@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.database import get_session
+from app.schemas.posts import PostSchema
+from app.services.posts import get_user_posts, USER_POSTS_PAGE_MAX_SIZE
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get("/{user_id}/posts", response_model=list[PostSchema])
+def get_user_posts_view(
+    user_id: int,
+    before_id: int | None = None,
+    limit: int = Query(20, ge=1, le=USER_POSTS_PAGE_MAX_SIZE),
+    session=Depends(get_session, use_cache=True),
+):
+    """
+    Получение постов пользователя от новых к старым.
+
+    :param user_id: Идентификатор пользователя.
+    :param before_id: Вернуть посты с id меньше указанного (id последнего поста предыдущей страницы).
+    :param limit: Количество постов на странице.
+    :param session: Сессия базы данных, полученная с помощью зависимости.
+    :return: Список постов, представленных в формате PostSchema.
+    """
+    return get_user_posts(session, user_id, before_id, limit)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, cast
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.services.auth import USER_IDENTIFIER, _get_token_payload
+from app.services.cache import AsyncBaseCache, get_async_cache
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+# Сколько хранится ответ на запрос с ключом идемпотентности (в секундах)
+IDEMPOTENCY_KEY_EXPIRE = int(os.getenv("IDEMPOTENCY_KEY_EXPIRE", 24 * 60 * 60))
+# Сколько повторный запрос ждет завершения исходного, прежде чем вернуть 409 (в секундах)
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))
+# Время жизни отметки "запрос выполняется", чтобы ключ освободился, если воркер упал во время обработки
+IDEMPOTENCY_LOCK_EXPIRE = int(os.getenv("IDEMPOTENCY_LOCK_EXPIRE", 60))
+_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class StoredResponse:
+    # Хэш тела исходного запроса: повтор с тем же ключом, но другим телом, отклоняется
+    fingerprint: str
+    # None, пока исходный запрос еще выполняется
+    status_code: int | None = None
+    body: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Обработка заголовка `Idempotency-Key` для POST запросов на указанные пути.
+
+    Ответ на первый запрос с ключом сохраняется в кэше на IDEMPOTENCY_KEY_EXPIRE секунд,
+    и повторы с тем же ключом получают его без обращения к обработчику и базе данных.
+    Повтор, пришедший во время выполнения исходного запроса, ждет его ответ.
+    Ответы с кодом 5xx не сохраняются, чтобы повтор мог выполнить запрос заново.
+
+    Ключ действует в пределах пути и пользователя из access токена, поэтому одинаковые ключи
+    разных пользователей не пересекаются, а новый токен того же пользователя не сбрасывает ключ.
+    Запросы без токена (например, регистрация) используют общую анонимную область.
+    Запросы с недействительным токеном передаются обработчику без обработки ключа.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        super().__init__(app)
+        self._paths = frozenset(paths)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if request.method != "POST" or idempotency_key is None or request.url.path not in self._paths:
+            return await call_next(request)
+
+        scope = _get_key_scope(request)
+        if scope is None:
+            return await call_next(request)
+
+        cache = get_async_cache()
+        cache_key = "idempotency:" + _hash(request.url.path.encode(), scope.encode(), idempotency_key.encode())
+        fingerprint = _hash(await request.body())
+
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            # Пытаемся стать исходным запросом для этого ключа
+            if await cache.add(cache_key, StoredResponse(fingerprint), IDEMPOTENCY_LOCK_EXPIRE):
+                return await self._execute(request, call_next, cache, cache_key, fingerprint)
+
+            stored: StoredResponse | None = await cache.get(cache_key)
+            if stored is None:
+                # Исходный запрос завершился ошибкой 5xx и освободил ключ - пробуем выполнить запрос сами
+                continue
+            if stored.fingerprint != fingerprint:
+                return JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was already used with a different request"},
+                )
+            if stored.status_code is not None:
+                return Response(
+                    content=stored.body,
+                    status_code=stored.status_code,
+                    headers={**stored.headers, "Idempotent-Replayed": "true"},
+                )
+            if time.monotonic() >= deadline:
+                return JSONResponse(
+                    status_code=409,
+                    content={"detail": "A request with this Idempotency-Key is still in progress"},
+                )
+            await asyncio.sleep(_POLL_INTERVAL)
+
+    @staticmethod
+    async def _execute(
+        request: Request,
+        call_next: RequestResponseEndpoint,
+        cache: AsyncBaseCache,
+        cache_key: str,
+        fingerprint: str,
+    ) -> Response:
+        """
+        Выполняет исходный запрос и сохраняет его ответ для повторов.
+        """
+        try:
+            # `call_next` возвращает потоковый ответ, даже если тип объявлен как Response
+            response = cast(StreamingResponse, await call_next(request))
+            body = b"".join([cast(bytes, chunk) async for chunk in response.body_iterator])
+        except BaseException:
+            await cache.delete(cache_key)
+            raise
+
+        # Длину тела Response посчитает заново
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        if response.status_code < 500:
+            stored = StoredResponse(fingerprint, response.status_code, body, headers)
+            await cache.set(cache_key, stored, IDEMPOTENCY_KEY_EXPIRE)
+        else:
+            await cache.delete(cache_key)
+
+        return Response(content=body, status_code=response.status_code, headers=headers)
+
+
+def _get_key_scope(request: Request) -> str | None:
+    """
+    Возвращает область действия ключа идемпотентности: пользователя из access токена запроса.
+
+    :return: "user:<id>", "anonymous" для запроса без токена или None, если токен недействителен.
+    """
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if not token or scheme.lower() != "bearer":
+        return "anonymous"
+    try:
+        return f"user:{_get_token_payload(token, 'access')[USER_IDENTIFIER]}"
+    except HTTPException:
+        return None
+
+
+def _hash(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, ForeignKey, Table, Column, Integer
+from sqlalchemy import String, Text, ForeignKey, Table, Column, Integer, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from .database import Base  # Импортируем базовый класс для моделей из нашего модуля database
@@ -24,15 +24,22 @@ posts_tag_table = Table(
     "posts_tags_table",
     Base.metadata,  # Метаданные базы данных, необходимые для декларативного определения таблицы
     Column("id", Integer, primary_key=True),
-    Column("posts_id", Integer, ForeignKey("posts.id", ondelete="CASCADE")),
+    Column("posts_id", Integer, ForeignKey("posts.id", ondelete="CASCADE"), index=True),
     # `ondelete="CASCADE"` означает, что при удалении записи в таблице posts все связанные записи
     # в этой вспомогательной таблице также будут удалены
-    Column("tags_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"))
+    Column("tags_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), index=True)
+    # `index=True` создает индексы по внешним ключам: они нужны для выборки тегов поста
+    # и для каскадного удаления
 )
 
 
 class Post(Base):
     __tablename__ = 'posts'  # Указываем имя таблицы для модели Post
+    __table_args__ = (
+        # Составной индекс для выборки постов пользователя от новых к старым
+        # и для каскадного удаления постов вместе с пользователем
+        Index("ix_posts_user_id_id", "user_id", "id"),
+    )
 
     # Колонки таблицы
     id: Mapped[int] = mapped_column(primary_key=True)  # Первичный ключ типа Integer
@@ -1,4 +1,5 @@
 import os
+import uuid
 from datetime import timedelta, datetime, UTC
 
 from fastapi import HTTPException
@@ -6,6 +7,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 
 from ..schemas.auth import TokenPairSchema
+from .token_revocation import revoked_tokens
 
 
 # Определяем схему OAuth2 для получения токена
@@ -34,26 +36,44 @@ def create_jwt_token_pair(user_id: int) -> TokenPairSchema:
         {USER_IDENTIFIER: user_id, "type": "access"},
         timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
-    # Создаем refresh_token с временем жизни REFRESH_TOKEN_EXPIRE_HOURS часов
+    # Создаем refresh_token с временем жизни REFRESH_TOKEN_EXPIRE_HOURS часов.
+    # Уникальный `jti` позволяет отозвать конкретный refresh_token.
     refresh_token = _create_jwt_token(
-        {USER_IDENTIFIER: user_id, "type": "refresh"},
+        {USER_IDENTIFIER: user_id, "type": "refresh", "jti": uuid.uuid4().hex},
         timedelta(hours=REFRESH_TOKEN_EXPIRE_HOURS),
     )
     return TokenPairSchema(access_token=access_token, refresh_token=refresh_token)
 
 
-def refresh_access_token(refresh_token: str) -> str:
+def refresh_access_token(refresh_token: str) -> TokenPairSchema:
     """
-    Создает новый access_token на основе переданного refresh_token.
+    Создает новую пару токенов на основе переданного refresh_token.
+
+    Refresh token одноразовый: при обмене он отзывается, а повторное использование
+    (в том числе одновременное из двух запросов) отклоняется.
+
+    :raises HTTPException: Если токен недействителен, отозван или уже использован.
     """
     # Извлекаем полезную нагрузку из refresh_token и проверяем его тип
     payload = _get_token_payload(refresh_token, "refresh")
 
-    # Создаем и возвращаем новый access_token на основе user_id из payload
-    return _create_jwt_token(
-        {USER_IDENTIFIER: payload[USER_IDENTIFIER], "type": "access"},
-        timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
-    )
+    # `revoke` атомарен, поэтому из нескольких одновременных обменов одного токена успешен только один
+    jti = payload["jti"]
+    if not revoked_tokens.revoke(jti, _get_token_ttl(payload)):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    # Создаем и возвращаем новую пару токенов на основе user_id из payload
+    return create_jwt_token_pair(user_id=payload[USER_IDENTIFIER])
+
+
+def revoke_refresh_token(refresh_token: str) -> None:
+    """
+    Отзывает refresh_token, например, при выходе пользователя из системы.
+
+    :raises HTTPException: Если токен недействителен.
+    """
+    payload = _get_token_payload(refresh_token, "refresh")
+    revoked_tokens.revoke(payload["jti"], _get_token_ttl(payload))
 
 
 def _create_jwt_token(data: dict, delta: timedelta) -> str:
@@ -94,5 +114,17 @@ def _get_token_payload(token: str, token_type: str) -> dict:
     # Проверяем, что идентификатор пользователя присутствует в payload
     if payload.get(USER_IDENTIFIER) is None:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
+    # Refresh токены без `jti` нельзя отозвать, поэтому они не принимаются
+    if token_type == "refresh" and not payload.get("jti"):
+        raise HTTPException(status_code=401, detail="Invalid token")
 
     return payload
+
+
+def _get_token_ttl(payload: dict) -> int:
+    """
+    Возвращает оставшееся время жизни токена в секундах.
+
+    :param payload: Полезная нагрузка токена.
+    """
+    return int(payload["exp"] - datetime.now(UTC).timestamp())
@@ -1,11 +1,17 @@
 import os
 
-from .base import BaseCache
-from .local import _local_cache
-from .redis import _redis_cache
+from .base import AsyncBaseCache, BaseCache
+from .local import _async_local_cache, _local_cache
+from .redis import _async_redis_cache, _redis_cache
 
 
 def get_cache() -> BaseCache:
     if os.getenv("REDIS_HOST"):
         return _redis_cache
     return _local_cache
+
+
+def get_async_cache() -> AsyncBaseCache:
+    if os.getenv("REDIS_HOST"):
+        return _async_redis_cache
+    return _async_local_cache
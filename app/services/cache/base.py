@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterable
 
 
 class BaseCache(ABC):
@@ -19,3 +19,70 @@ class BaseCache(ABC):
     @abstractmethod
     def clear(self):
         pass
+
+    @abstractmethod
+    def add(self, key: str, value: Any, expire: int) -> bool:
+        """
+        Атомарно записывает значение, только если ключа еще нет в кэше.
+
+        :return: True, если значение было записано.
+        """
+        pass
+
+
+class AsyncBaseCache(ABC):
+    """
+    Асинхронный интерфейс кэша.
+
+    Помимо одиночных операций содержит пакетные `get_many`, `set_many` и `delete_many`,
+    которые позволяют получить или записать несколько значений за одно обращение к хранилищу.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, expire: int):
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        pass
+
+    @abstractmethod
+    async def add(self, key: str, value: Any, expire: int) -> bool:
+        """
+        Атомарно записывает значение, только если ключа еще нет в кэше.
+
+        :return: True, если значение было записано.
+        """
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """
+        Возвращает значения сразу для нескольких ключей.
+
+        :param keys: Ключи кэша.
+        :return: Словарь `ключ -> значение`, ключи без значения в него не попадают.
+        """
+        pass
+
+    @abstractmethod
+    async def set_many(self, mapping: dict[str, Any], expire: int):
+        """
+        Записывает сразу несколько значений с одинаковым временем жизни.
+
+        :param mapping: Словарь `ключ -> значение`.
+        :param expire: Время жизни значений в секундах.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]):
+        pass
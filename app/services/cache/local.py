@@ -1,8 +1,13 @@
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Iterable
 
-from .base import BaseCache
+from .base import AsyncBaseCache, BaseCache
+
+# Раз в столько записей из кэша удаляются все устаревшие значения. Иначе значение удаляется,
+# только когда запрашивается тот же ключ, и кэш с уникальными ключами (например, `jti`) растет бесконечно.
+LOCAL_CACHE_SWEEP_INTERVAL = 1000
 
 
 @dataclass
@@ -11,10 +16,22 @@ class CacheValue:
     exp: datetime
 
 
+def _sweep_expired(cache: dict[str, CacheValue], now: datetime):
+    """
+    Удаляет из кэша все устаревшие значения.
+    """
+    # Копия элементов: `get` и `delete` могут изменять словарь из других потоков во время обхода
+    for key, item in list(cache.items()):
+        if item.exp <= now and cache.get(key) is item:
+            cache.pop(key, None)
+
+
 class LocalCache(BaseCache):
 
     def __init__(self):
         self._cache: dict[str, CacheValue] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
 
     def get(self, key: str) -> Any:
         print("GET LOCAL CACHE", key)
@@ -27,7 +44,8 @@ class LocalCache(BaseCache):
 
     def set(self, key: str, value: Any, expire: int):
         print("SET LOCAL CACHE", key, value)
-        self._cache[key] = CacheValue(value=value, exp=datetime.now() + timedelta(expire))
+        with self._lock:
+            self._write(key, value, expire)
 
     def delete(self, key: str):
         try:
@@ -38,5 +56,87 @@ class LocalCache(BaseCache):
     def clear(self):
         self._cache = {}
 
+    def add(self, key: str, value: Any, expire: int) -> bool:
+        # Синхронные обработчики FastAPI выполняются в пуле потоков, поэтому проверка и запись под блокировкой
+        with self._lock:
+            item = self._cache.get(key)
+            if item is not None and item.exp > datetime.now():
+                return False
+            self._write(key, value, expire)
+            return True
+
+    def _write(self, key: str, value: Any, expire: int):
+        # Вызывается под блокировкой
+        now = datetime.now()
+        self._cache[key] = CacheValue(value=value, exp=now + timedelta(seconds=expire))
+        self._writes += 1
+        if self._writes % LOCAL_CACHE_SWEEP_INTERVAL == 0:
+            _sweep_expired(self._cache, now)
+
+
+class AsyncLocalCache(AsyncBaseCache):
+    """
+    Асинхронный кэш в памяти процесса с тем же интерфейсом, что и у `AsyncRedisCache`.
+    Используется, когда Redis не настроен.
+    """
+
+    def __init__(self):
+        self._cache: dict[str, CacheValue] = {}
+        self._writes = 0
+
+    async def get(self, key: str) -> Any:
+        return self._get(key, datetime.now())
+
+    async def set(self, key: str, value: Any, expire: int):
+        self._write(key, value, expire)
+
+    async def delete(self, key: str):
+        self._cache.pop(key, None)
+
+    async def clear(self):
+        self._cache = {}
+
+    async def add(self, key: str, value: Any, expire: int) -> bool:
+        # Между проверкой и записью нет `await`, поэтому другие корутины не могут вклиниться
+        if self._get(key, datetime.now()) is not None:
+            return False
+        self._write(key, value, expire)
+        return True
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        now = datetime.now()
+        result = {}
+        for key in keys:
+            value = self._get(key, now)
+            if value is not None:
+                result[key] = value
+        return result
+
+    async def set_many(self, mapping: dict[str, Any], expire: int):
+        for key, value in mapping.items():
+            self._write(key, value, expire)
+
+    async def delete_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def _get(self, key: str, now: datetime) -> Any:
+        item = self._cache.get(key)
+        if item is None:
+            return None
+        if item.exp > now:
+            return item.value
+        # Значение устарело - удаляем его
+        del self._cache[key]
+        return None
+
+    def _write(self, key: str, value: Any, expire: int):
+        now = datetime.now()
+        self._cache[key] = CacheValue(value=value, exp=now + timedelta(seconds=expire))
+        self._writes += 1
+        if self._writes % LOCAL_CACHE_SWEEP_INTERVAL == 0:
+            _sweep_expired(self._cache, now)
+
 
 _local_cache = LocalCache()
+_async_local_cache = AsyncLocalCache()
@@ -1,10 +1,11 @@
 import os
 import pickle
-from typing import Any
+from typing import Any, Iterable
 
 from redis import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool as AsyncConnectionPool, Redis as AsyncRedis
 
-from .base import BaseCache
+from .base import AsyncBaseCache, BaseCache
 
 
 class RedisCache(BaseCache):
@@ -36,6 +37,88 @@ class RedisCache(BaseCache):
     def clear(self):
         self._redis.flushdb()
 
+    def add(self, key: str, value: Any, expire: int) -> bool:
+        return bool(self._redis.set(key, pickle.dumps(value), ex=expire, nx=True))
+
+
+class AsyncRedisCache(AsyncBaseCache):
+    """
+    Асинхронный кэш на основе `redis.asyncio`, не блокирующий цикл событий.
+
+    Пакетные операции выполняются за один сетевой запрос:
+    `get_many` - через MGET, `set_many` - через pipeline без транзакции.
+    """
+
+    def __init__(self, host: str, port: int, db: int, password: str | None = None, max_connections: int = 10):
+        self._connections_pool = AsyncConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections,
+        )
+        self._redis = AsyncRedis(connection_pool=self._connections_pool)
+
+    async def get(self, key: str) -> Any:
+        value: bytes | None = await self._redis.get(key)
+        if value is not None:
+            return pickle.loads(value)
+        return None
+
+    async def set(self, key: str, value: Any, expire: int):
+        await self._redis.set(key, pickle.dumps(value), ex=expire)
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def clear(self):
+        await self._redis.flushdb()
+
+    async def add(self, key: str, value: Any, expire: int) -> bool:
+        return bool(await self._redis.set(key, pickle.dumps(value), ex=expire, nx=True))
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values: list[bytes | None] = await self._redis.mget(keys)
+        return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, mapping: dict[str, Any], expire: int):
+        if not mapping:
+            return
+        # MSET не умеет устанавливать время жизни, поэтому отправляем пачку SET одним pipeline.
+        # `transaction=False` - нам не нужна атомарность MULTI/EXEC, только один сетевой запрос.
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, pickle.dumps(value), ex=expire)
+            await pipe.execute()
+
+    async def delete_many(self, keys: Iterable[str]):
+        keys = list(keys)
+        if keys:
+            await self._redis.delete(*keys)
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Возвращает метрики пула подключений к Redis.
+
+        :return: Словарь с максимальным, созданным, свободным и занятым количеством подключений.
+        """
+        pool = self._connections_pool
+        available = len(pool._available_connections)
+        in_use = len(pool._in_use_connections)
+        return {
+            "max_connections": pool.max_connections,
+            # Асинхронный пул не хранит счетчик созданных подключений
+            "created_connections": available + in_use,
+            "available_connections": available,
+            "in_use_connections": in_use,
+        }
+
+    async def close(self):
+        await self._redis.aclose()
+
 
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
@@ -45,3 +128,6 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 _redis_cache = RedisCache(
     host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, password=REDIS_PASSWORD, max_connections=10
 )
+_async_redis_cache = AsyncRedisCache(
+    host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, password=REDIS_PASSWORD, max_connections=10
+)
@@ -1,6 +1,65 @@
+import math
+import os
+import time
+from functools import cache
+
 from passlib.context import CryptContext
+from passlib.hash import argon2, bcrypt
+
+# Алгоритм хэширования новых паролей: "bcrypt" или "argon2" (требует пакет argon2-cffi).
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+
+# Желаемое время проверки одного пароля на текущем оборудовании (в миллисекундах).
+# Стоимость хэширования подбирается при запуске так, чтобы приблизиться к этому значению.
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", 250))
+# Если калибровка отключена, используется минимально допустимая стоимость.
+PASSWORD_HASH_CALIBRATE = os.getenv("PASSWORD_HASH_CALIBRATE", "1") == "1"
+
+# Границы стоимости. Нижняя граница - порог безопасности, ниже которого калибровка не опустится
+# даже на медленном оборудовании.
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+ARGON2_MIN_TIME_COST = int(os.getenv("ARGON2_MIN_TIME_COST", 2))
+ARGON2_MAX_TIME_COST = int(os.getenv("ARGON2_MAX_TIME_COST", 16))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 64 * 1024))  # В килобайтах
 
-__pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+@cache
+def get_pwd_context() -> CryptContext:
+    """
+    Создает контекст хэширования паролей с откалиброванной стоимостью.
+
+    Калибровка выполняется один раз на процесс. Хэши с меньшей стоимостью или
+    устаревшим алгоритмом помечаются контекстом как требующие обновления.
+
+    :return: Контекст хэширования паролей.
+    :raises RuntimeError: Если выбран argon2, но пакет argon2-cffi не установлен.
+    """
+    if PASSWORD_HASH_SCHEME == "argon2":
+        if not argon2.has_backend():
+            raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 requires the argon2-cffi package")
+
+        time_cost = _calibrate_argon2_time_cost() if PASSWORD_HASH_CALIBRATE else ARGON2_MIN_TIME_COST
+        # bcrypt остается в списке схем, чтобы проверять старые хэши.
+        # `deprecated="auto"` помечает их устаревшими, и при входе они будут перехэшированы в argon2.
+        return CryptContext(
+            schemes=["argon2", "bcrypt"],
+            deprecated="auto",
+            argon2__time_cost=time_cost,
+            argon2__min_rounds=time_cost,
+            argon2__memory_cost=ARGON2_MEMORY_COST,
+        )
+
+    rounds = _calibrate_bcrypt_rounds() if PASSWORD_HASH_CALIBRATE else BCRYPT_MIN_ROUNDS
+    # `min_rounds` заставляет `needs_update` возвращать True для хэшей с меньшей стоимостью.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
 
 
 def encrypt_password(password: str) -> str:
@@ -10,7 +69,7 @@ def encrypt_password(password: str) -> str:
     :param password: Пароль в виде строки, который нужно захешировать.
     :return: Захешированный пароль в виде строки.
     """
-    return __pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def validate_password(plain_password: str, hashed_password: str) -> bool:
@@ -21,4 +80,49 @@ def validate_password(plain_password: str, hashed_password: str) -> bool:
     :param hashed_password: Захешированный пароль в виде строки, с которым нужно сравнить введенный пароль.
     :return: True, если введенный пароль соответствует захешированному, иначе False.
     """
-    return __pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    """
+    Проверяет, нужно ли перехэшировать пароль текущими настройками
+    (устаревший алгоритм или стоимость ниже откалиброванной).
+
+    :param hashed_password: Захешированный пароль.
+    :return: True, если хэш нужно обновить.
+    """
+    return get_pwd_context().needs_update(hashed_password)
+
+
+def _calibrate_bcrypt_rounds() -> int:
+    """
+    Подбирает количество раундов bcrypt под PASSWORD_HASH_TARGET_MS.
+    Каждый дополнительный раунд удваивает время хэширования.
+    """
+    elapsed_ms = _measure_hash_ms(bcrypt.using(rounds=BCRYPT_MIN_ROUNDS))
+    extra_rounds = math.floor(math.log2(PASSWORD_HASH_TARGET_MS / elapsed_ms)) if elapsed_ms > 0 else 0
+    return min(max(BCRYPT_MIN_ROUNDS + extra_rounds, BCRYPT_MIN_ROUNDS), BCRYPT_MAX_ROUNDS)
+
+
+def _calibrate_argon2_time_cost() -> int:
+    """
+    Подбирает time_cost argon2 под PASSWORD_HASH_TARGET_MS.
+    Время хэширования растет примерно линейно с time_cost.
+    """
+    handler = argon2.using(time_cost=ARGON2_MIN_TIME_COST, memory_cost=ARGON2_MEMORY_COST)
+    ms_per_pass = _measure_hash_ms(handler) / ARGON2_MIN_TIME_COST
+    time_cost = math.floor(PASSWORD_HASH_TARGET_MS / ms_per_pass) if ms_per_pass > 0 else 0
+    return min(max(time_cost, ARGON2_MIN_TIME_COST), ARGON2_MAX_TIME_COST)
+
+
+def _measure_hash_ms(handler, attempts: int = 3) -> float:
+    """
+    Возвращает минимальное время хэширования пароля указанным обработчиком (в миллисекундах).
+    Минимум из нескольких попыток меньше подвержен влиянию случайных задержек.
+    """
+    timings = []
+    for _ in range(attempts):
+        start = time.perf_counter()
+        handler.hash(_CALIBRATION_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
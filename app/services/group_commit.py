@@ -0,0 +1,176 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import engine
+
+# Включает объединение записей: вставки из разных запросов выполняются одним потоком-писателем
+# и подтверждаются общим commit. Полезно для SQLite, где одновременно писать может только одно подключение.
+DB_WRITE_COALESCING = os.getenv("DB_WRITE_COALESCING", "0") == "1"
+# Максимальное количество операций в одном commit
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", 64))
+# Сколько писатель ждет следующие операции после первой, прежде чем выполнить commit (в миллисекундах)
+DB_WRITE_BATCH_WINDOW_MS = float(os.getenv("DB_WRITE_BATCH_WINDOW_MS", 2))
+# Сколько вызывающий поток ждет результат операции (в секундах)
+DB_WRITE_TIMEOUT = float(os.getenv("DB_WRITE_TIMEOUT", 30))
+
+# Объекты, созданные писателем, возвращаются вызывающим потокам уже после закрытия сессии,
+# поэтому `expire_on_commit=False` сохраняет их загруженные атрибуты (в том числе сгенерированный id).
+WriterSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _WriteRequest:
+    operation: Callable[[Session], Any]
+    future: Future = field(default_factory=Future)
+
+
+class GroupCommitWriter:
+    """
+    Поток-писатель, который выполняет операции записи пачками в одной транзакции.
+
+    Каждая операция получает сессию писателя, добавляет в нее объекты и возвращает результат,
+    но не вызывает commit. После каждой операции выполняется flush, поэтому ошибка (например,
+    IntegrityError) относится к конкретной операции: она возвращается только ее вызывающему,
+    а остальные операции пачки выполняются заново в новой транзакции.
+    Поэтому операция должна создавать свои объекты сама и не иметь побочных эффектов вне сессии.
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int, batch_window_ms: float, timeout: float):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._batch_window = batch_window_ms / 1000
+        self._timeout = timeout
+        self._queue: queue.Queue[_WriteRequest | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, operation: Callable[[Session], T]) -> T:
+        """
+        Ставит операцию в очередь и ждет подтверждения ее транзакции.
+
+        :param operation: Функция, принимающая сессию писателя и возвращающая результат.
+        :return: Результат операции после commit.
+        :raises Exception: Исключение, возникшее при выполнении этой операции или при commit.
+        :raises TimeoutError: Если результат не получен за DB_WRITE_TIMEOUT секунд.
+         Операция, которую писатель уже начал выполнять, при этом все равно может быть подтверждена.
+        """
+        self._ensure_started()
+        request = _WriteRequest(operation)
+        self._queue.put(request)
+        try:
+            return request.future.result(timeout=self._timeout)
+        except TimeoutError:
+            # Операция, еще не взятая писателем, отменяется и выполнена не будет
+            request.future.cancel()
+            raise
+
+    def stop(self):
+        """
+        Останавливает поток-писатель после выполнения уже поставленных в очередь операций.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            # Поток перезапускается, если он завершился из-за непредвиденной ошибки
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch, stopped = self._collect_batch()
+            try:
+                if batch:
+                    self._commit_batch(batch)
+            except BaseException as exc:
+                # Например, rollback на оборвавшемся подключении. Поток продолжает работу,
+                # а ожидающие операции пачки получают ошибку, вместо того чтобы ждать вечно.
+                logger.exception("Group commit batch failed")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+            if stopped:
+                return
+
+    def _collect_batch(self) -> tuple[list[_WriteRequest], bool]:
+        """
+        Ждет первую операцию, а затем набирает пачку, пока не истечет окно или не наберется
+        DB_WRITE_BATCH_SIZE операций.
+
+        :return: Пачка операций и признак остановки писателя.
+        """
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch: list[_WriteRequest] = []
+        self._append_request(batch, first)
+        deadline = time.monotonic() + self._batch_window
+        while len(batch) < self._batch_size:
+            try:
+                # Уже ожидающие операции забираем сразу, даже если окно истекло
+                timeout = deadline - time.monotonic()
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            self._append_request(batch, request)
+        return batch, False
+
+    @staticmethod
+    def _append_request(batch: list[_WriteRequest], request: _WriteRequest):
+        # Операции, отмененные вызывающим по таймауту, пропускаются.
+        # После этого вызова операцию уже нельзя отменить.
+        if request.future.set_running_or_notify_cancel():
+            batch.append(request)
+
+    def _commit_batch(self, batch: list[_WriteRequest]):
+        while batch:
+            results = []
+            with self._session_factory() as session:
+                request = None
+                try:
+                    for request in batch:
+                        results.append(request.operation(session))
+                        session.flush()
+                    request = None
+                    session.commit()
+                except Exception as exc:
+                    session.rollback()
+                    if request is None:
+                        # Ошибка при commit не относится к конкретной операции
+                        for failed in batch:
+                            failed.future.set_exception(exc)
+                        return
+                    # Ошибку получает только виновная операция, остальные выполняются заново
+                    request.future.set_exception(exc)
+                    batch = [item for item in batch if item is not request]
+                    continue
+
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+            return
+
+
+group_commit_writer = GroupCommitWriter(
+    WriterSessionLocal, DB_WRITE_BATCH_SIZE, DB_WRITE_BATCH_WINDOW_MS, DB_WRITE_TIMEOUT
+)
@@ -1,37 +1,98 @@
-from typing import Sequence
+import json
+from dataclasses import dataclass
+from typing import Any
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
 
-from app.models import Post, Tag, User
+from app.models import Post, Tag, User, posts_tag_table
 from app.schemas.posts import CreatePostSchema
 from app.services.cache import get_cache
+from app.services.group_commit import DB_WRITE_COALESCING, group_commit_writer
 
+# Длина содержимого поста в режиме краткого списка (summary)
+POST_SUMMARY_LENGTH = 200
+# Максимальный размер страницы постов пользователя.
+# Первая страница кэшируется целиком, а запросы с меньшим `limit` получают ее срез.
+USER_POSTS_PAGE_MAX_SIZE = 100
 
-def get_posts(session: Session) -> Sequence[Post]:
+# Запрос строк `(id, title, content, user_id, tags)` для списков постов
+PostListRowsSelect = Select[tuple[int, str, str, int, Any]]
+
+
+@dataclass(slots=True)
+class TagItem:
+    name: str
+
+
+@dataclass(slots=True)
+class PostListItem:
+    """
+    Облегченное представление поста для списков.
+    Создается напрямую из строк результата запроса, минуя ORM и identity map.
+    """
+
+    id: int
+    title: str
+    content: str
+    user_id: int
+    tags: list[TagItem]
+
+
+def get_posts_list(session: Session, summary: bool = False) -> list[PostListItem]:
     """
-    Возвращает все посты из базы данных.
+    Возвращает все посты для отображения списком.
+
+    ORM объекты не создаются: выбираются только нужные колонки,
+    а теги агрегируются в один столбец на стороне базы данных, поэтому весь список
+    получается одним запросом.
 
     :param session: Объект сессии для взаимодействия с базой данных.
-    :param cache: Объект кэша.
-    :return: Список всех постов.
+    :param summary: Если True, содержимое постов обрезается в SQL до POST_SUMMARY_LENGTH символов.
+    :return: Список постов.
     """
     cache = get_cache()
+    cache_key = "posts:summary" if summary else "posts:list"
 
-    # `session.scalars(...)` Выполняет запрос и возвращает результаты в виде скаляров (одиночных значений),
-    # представляющих записи Post.
-    # `selectinload(Post.tags)` используется для выполнения эффективного запроса и загрузки тегов
-    # (связанных объектов Tag) вместе с основными записями Post в одном запросе.
-    # Это предотвращает проблему "N+1 запросов", когда для каждой записи Post делается отдельный
-    # запрос для загрузки связанных Tag.
-
-    data = cache.get("posts")
+    data = cache.get(cache_key)
     if data is None:
-        data = session.scalars(select(Post).options(selectinload(Post.tags))).all()
-        cache.set("posts", data, 10)
+        data = _fetch_post_list_items(session, _select_post_list_rows(session, summary))
+        cache.set(cache_key, data, 10)
     return data
 
 
+def get_user_posts(
+    session: Session, user_id: int, before_id: int | None = None, limit: int = 20
+) -> list[PostListItem]:
+    """
+    Возвращает страницу постов пользователя от новых к старым.
+
+    Используется постраничная навигация по ключу: следующая страница запрашивается
+    с `before_id`, равным id последнего поста предыдущей страницы. Такой запрос
+    обслуживается индексом `(user_id, id)` без OFFSET.
+
+    Новые посты попадают только на первую страницу, поэтому кэшируется только она.
+
+    :param session: Объект сессии для взаимодействия с базой данных.
+    :param user_id: Идентификатор пользователя.
+    :param before_id: Вернуть посты с id меньше указанного.
+    :param limit: Количество постов на странице, не больше USER_POSTS_PAGE_MAX_SIZE.
+    :return: Список постов.
+    """
+    if before_id is not None:
+        return _fetch_post_list_items(session, _select_user_post_rows(session, user_id, before_id, limit))
+
+    cache = get_cache()
+    cache_key = _user_posts_cache_key(user_id)
+
+    data = cache.get(cache_key)
+    if data is None:
+        query = _select_user_post_rows(session, user_id, None, USER_POSTS_PAGE_MAX_SIZE)
+        data = _fetch_post_list_items(session, query)
+        cache.set(cache_key, data, 60)
+    return data[:limit]
+
+
 def create_post(session: Session, post_data: CreatePostSchema, user: User) -> Post:
     """
     Создает новый пост в базе данных.
@@ -41,6 +102,34 @@ def create_post(session: Session, post_data: CreatePostSchema, user: User) -> Po
     :param user: Объект пользователя, который создает пост.
     :return: Созданный объект поста.
     """
+    if DB_WRITE_COALESCING:
+        user_id = user.id
+        # Возвращаем подключение запроса в пул до ожидания писателя, иначе при большом количестве
+        # одновременных запросов писателю может не хватить подключения.
+        session.close()
+        # Пост создается потоком-писателем и подтверждается общим commit вместе с другими вставками
+        post = group_commit_writer.submit(lambda writer_session: _add_post(writer_session, post_data, user_id))
+    else:
+        post = _add_post(session, post_data, user.id)
+        session.commit()  # Фиксируем изменения в базе данных
+
+        # Обновляем объект post из базы данных, чтобы получить все его обновленные поля, такие как id
+        session.refresh(post)
+
+    # Первая страница постов пользователя изменилась
+    get_cache().delete(_user_posts_cache_key(post.user_id))
+    return post
+
+
+def _add_post(session: Session, post_data: CreatePostSchema, user_id: int) -> Post:
+    """
+    Добавляет новый пост в сессию без commit.
+
+    :param session: Объект сессии для взаимодействия с базой данных.
+    :param post_data: Данные для создания поста.
+    :param user_id: Идентификатор автора поста.
+    :return: Объект поста.
+    """
     # Получаем или создаем теги, указанные в post_data.tags, без фиксации изменений в базе данных.
     tags = _get_or_create_tags(session, post_data.tags)
 
@@ -48,14 +137,10 @@ def create_post(session: Session, post_data: CreatePostSchema, user: User) -> Po
     post = Post(
         title=post_data.title,
         content=post_data.content,
-        user_id=user.id,
+        user_id=user_id,
     )
     post.tags = tags  # Привязываем теги к посту
     session.add(post)  # Добавляем новый пост в сессию
-    session.commit()  # Фиксируем изменения в базе данных
-
-    # Обновляем объект post из базы данных, чтобы получить все его обновленные поля, такие как id
-    session.refresh(post)
     return post
 
 
@@ -70,7 +155,7 @@ def _get_or_create_tags(session: Session, tags: list[str]) -> list[Tag]:
     model_tags = []  # Список для хранения объектов Tag
     for tag_name in tags:
         # Выполняем запрос для поиска тега по имени (независимо от регистра)
-        result = session.execute(select(Tag).where(Tag.name.ilike(tag_name)))
+        result = session.execute(_select_tag_by_name(tag_name))
         result.unique()  # Убедиться, что результат уникален (одна запись)
 
         # Получаем тег из результата запроса, если он существует, иначе None
@@ -86,3 +171,79 @@ def _get_or_create_tags(session: Session, tags: list[str]) -> list[Tag]:
 
     # Возвращаем список тегов
     return model_tags
+
+
+def _select_tag_by_name(name: str) -> Select[tuple[Tag]]:
+    return select(Tag).where(Tag.name.ilike(name))
+
+
+def _select_post_list_rows(session: Session, summary: bool = False) -> PostListRowsSelect:
+    """
+    Формирует запрос, возвращающий строки `(id, title, content, user_id, tags)`,
+    где `tags` - агрегированные в JSON массив имена тегов поста.
+
+    :param session: Объект сессии, по диалекту которой выбирается функция агрегации.
+    :param summary: Обрезать ли содержимое поста в SQL.
+    :return: Объект запроса.
+    """
+    content = func.substr(Post.content, 1, POST_SUMMARY_LENGTH) if summary else Post.content
+
+    # SQLite собирает JSON массив через `json_group_array`, PostgreSQL - через `json_agg`.
+    if session.get_bind().dialect.name == "postgresql":
+        tags = func.json_agg(Tag.name)
+    else:
+        tags = func.json_group_array(Tag.name)
+
+    # LEFT JOIN оставляет посты без тегов, для них агрегат вернет `[null]`.
+    # Группировка по первичному ключу позволяет выбирать остальные колонки поста без агрегатов.
+    return (
+        select(Post.id, Post.title, content.label("content"), Post.user_id, tags.label("tags"))
+        .select_from(Post)
+        .outerjoin(posts_tag_table, posts_tag_table.c.posts_id == Post.id)
+        .outerjoin(Tag, Tag.id == posts_tag_table.c.tags_id)
+        .group_by(Post.id)
+        .order_by(Post.id)
+    )
+
+
+def _select_user_post_rows(session: Session, user_id: int, before_id: int | None, limit: int) -> PostListRowsSelect:
+    """
+    Формирует запрос страницы постов пользователя в формате `_select_post_list_rows`.
+
+    Сначала по индексу `(user_id, id)` выбираются id постов страницы,
+    и только для них выполняется соединение с тегами и агрегация.
+    """
+    page = select(Post.id).where(Post.user_id == user_id).order_by(Post.id.desc()).limit(limit)
+    if before_id is not None:
+        page = page.where(Post.id < before_id)
+
+    return _select_post_list_rows(session).where(Post.id.in_(page)).order_by(None).order_by(Post.id.desc())
+
+
+def _user_posts_cache_key(user_id: int) -> str:
+    return f"posts:user:{user_id}"
+
+
+def _fetch_post_list_items(session: Session, query: PostListRowsSelect) -> list[PostListItem]:
+    """
+    Выполняет запрос из `_select_post_list_rows` и преобразует строки в `PostListItem`.
+
+    :param session: Объект сессии для взаимодействия с базой данных.
+    :param query: Запрос, возвращающий строки `(id, title, content, user_id, tags)`.
+    :return: Список постов.
+    """
+    items = []
+    for post_id, title, content, user_id, tags in session.execute(query):
+        # SQLite возвращает JSON строкой, драйвер PostgreSQL - уже разобранным списком
+        if isinstance(tags, str):
+            tags = json.loads(tags)
+        items.append(
+            PostListItem(
+                id=post_id,
+                title=title,
+                content=content,
+                user_id=user_id,
+                tags=[TagItem(name=name) for name in tags if name is not None],
+            )
+        )
+    return items
@@ -0,0 +1,27 @@
+from app.services.cache import get_cache
+
+REVOKED_TOKEN_KEY_PREFIX = "revoked-token:"
+
+
+class TokenRevocationList:
+    """
+    Список отозванных (или уже использованных) идентификаторов токенов `jti`.
+
+    Каждый `jti` хранится в кэше (Redis, если он настроен) ровно столько, сколько еще действовал бы токен.
+    Одноразовость токена обеспечивает только атомарная запись `revoke`: отдельная проверка перед ней
+    все равно обращалась бы к кэшу и не защищала бы от одновременного использования токена.
+    """
+
+    def revoke(self, jti: str, expire: int) -> bool:
+        """
+        Атомарно отзывает `jti`.
+
+        :param jti: Идентификатор токена.
+        :param expire: Оставшееся время жизни токена в секундах.
+        :return: True, если токен был отозван этим вызовом, и False, если он уже был отозван ранее
+         (в том числе другим воркером).
+        """
+        return get_cache().add(REVOKED_TOKEN_KEY_PREFIX + jti, 1, max(expire, 1))
+
+
+revoked_tokens = TokenRevocationList()
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import NoResultFound
 from fastapi import Depends, HTTPException
@@ -7,7 +7,8 @@ from app.database import get_session
 from app.models import User
 from app.schemas.auth import UserCreateSchema
 from app.services.auth import _get_token_payload, oauth2_scheme, USER_IDENTIFIER
-from app.services.encrypt import encrypt_password, validate_password
+from app.services.encrypt import encrypt_password, password_needs_update, validate_password
+from app.services.group_commit import DB_WRITE_COALESCING, group_commit_writer
 
 
 def create_user(session: Session, user: UserCreateSchema) -> User:
@@ -17,17 +18,33 @@ def create_user(session: Session, user: UserCreateSchema) -> User:
     :param user: Данные пользователя.
     :return: Объект модели пользователя.
     """
-    # Преобразуем данные пользователя из схемы в объект модели пользователя
-    user_model = User(**user.model_dump())
-    # Шифруем пароль
-    user_model.password = encrypt_password(user_model.password)
+    # Шифруем пароль до постановки в очередь писателя, чтобы не занимать его хэшированием
+    user_data = user.model_dump()
+    user_data["password"] = encrypt_password(user_data["password"])
 
-    session.add(user_model)  # Добавляем пользователя в сессию для последующего создания в базе.
+    if DB_WRITE_COALESCING:
+        # Пользователь создается потоком-писателем и подтверждается общим commit вместе с другими вставками
+        return group_commit_writer.submit(lambda writer_session: _add_user(writer_session, user_data))
+
+    user_model = _add_user(session, user_data)
     session.commit()  # Подтверждаем изменения, чтобы создать пользователя в базе.
     session.refresh(user_model)  # Обновляем объект пользователя, чтобы получить сгенерированный ID.
     return user_model
 
 
+def _add_user(session: Session, user_data: dict) -> User:
+    """
+    Добавляет пользователя в сессию без commit.
+    :param session: Объект сессии с базой данных.
+    :param user_data: Данные пользователя с уже захешированным паролем.
+    :return: Объект модели пользователя.
+    """
+    # Преобразуем данные пользователя в объект модели пользователя
+    user_model = User(**user_data)
+    session.add(user_model)  # Добавляем пользователя в сессию для последующего создания в базе.
+    return user_model
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     session: Session = Depends(get_session, use_cache=True),
@@ -45,8 +62,7 @@ def get_current_user(
 
     try:
         # Формируем запрос для получения пользователя из базы данных по его ID
-        query = select(User).where(User.id == payload[USER_IDENTIFIER])
-        print(query)
+        query = _select_user_by_id(payload[USER_IDENTIFIER])
         result = session.execute(query)  # Выполняем запрос
         result.unique()  # Убедиться, что результат уникален (одна запись)
 
@@ -70,8 +86,7 @@ async def get_user_by_credentials(session: Session, username: str, password: str
     """
     try:
         # Формируем запрос для получения пользователя из базы данных по его имени пользователя
-        query = select(User).where(User.username == username)
-        print(query)
+        query = _select_user_by_username(username)
         result = session.execute(query)  # Выполняем запрос
         result.unique()  # Убедиться, что результат уникален (одна запись)
         # Извлекаем объект пользователя из результата запроса
@@ -86,5 +101,19 @@ async def get_user_by_credentials(session: Session, username: str, password: str
         # Если пароли не совпадают, выбрасываем исключение HTTP 401 Unauthorized
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
+    # Если хэш пароля создан устаревшим алгоритмом или с меньшей стоимостью, чем откалиброванная,
+    # перехэшируем пароль, пока он известен в открытом виде.
+    if password_needs_update(user.password):
+        user.password = encrypt_password(password)
+        session.commit()
+
     # Если все проверки пройдены, возвращаем объект пользователя
     return user
+
+
+def _select_user_by_id(user_id: int) -> Select[tuple[User]]:
+    return select(User).where(User.id == user_id)
+
+
+def _select_user_by_username(username: str) -> Select[tuple[User]]:
+    return select(User).where(User.username == username)
@@ -0,0 +1,78 @@
+import logging
+import os
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.database import SessionLocal, engine
+from app.services.encrypt import get_pwd_context
+from app.services.posts import USER_POSTS_PAGE_MAX_SIZE, _select_tag_by_name, _select_user_post_rows
+from app.services.users import _select_user_by_id, _select_user_by_username
+
+logger = logging.getLogger(__name__)
+
+# Сколько подключений к базе данных открыть заранее при запуске воркера
+DB_POOL_WARM_CONNECTIONS = int(os.getenv("DB_POOL_WARM_CONNECTIONS", 5))
+
+_ready = False
+
+
+def is_ready() -> bool:
+    """
+    Возвращает True, когда прогрев завершен и воркер готов принимать трафик.
+    """
+    return _ready
+
+
+def warm_up() -> None:
+    """
+    Прогревает воркер перед приемом трафика:
+    калибрует хэширование паролей, открывает подключения пула и заполняет кэш
+    скомпилированных SQL запросов SQLAlchemy.
+
+    Кэш данных не заполняется: список постов читает всю таблицу, и такой запрос
+    при каждом запуске воркера нагружал бы базу данных сильнее, чем первые запросы пользователей.
+
+    Прогрев только ускоряет первые запросы, поэтому его ошибка не делает воркер неготовым.
+    """
+    global _ready
+    try:
+        get_pwd_context()
+        _open_pool_connections(engine, DB_POOL_WARM_CONNECTIONS)
+        with SessionLocal() as session:
+            _warm_statement_cache(session)
+    except Exception:
+        logger.exception("Warm-up failed")
+    _ready = True
+
+
+def _open_pool_connections(db_engine: Engine, count: int) -> None:
+    """
+    Одновременно открывает `count` подключений и возвращает их в пул.
+    """
+    # Подключения сверх размера пула (overflow) при возврате закрываются, поэтому открывать их нет смысла
+    if isinstance(db_engine.pool, QueuePool):
+        count = min(count, db_engine.pool.size())
+
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(db_engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _warm_statement_cache(session: Session) -> None:
+    """
+    Выполняет горячие запросы с параметрами, не находящими ни одной строки.
+    SQLAlchemy кэширует скомпилированный SQL по структуре запроса, поэтому
+    настоящие запросы с другими параметрами уже не будут компилироваться.
+    """
+    session.execute(_select_user_by_id(-1)).all()
+    session.execute(_select_user_by_username("")).all()
+    session.execute(_select_tag_by_name("")).all()
+    session.execute(_select_user_post_rows(session, -1, None, USER_POSTS_PAGE_MAX_SIZE)).all()
+    session.execute(_select_user_post_rows(session, -1, 0, USER_POSTS_PAGE_MAX_SIZE)).all()
+    session.rollback()
@@ -0,0 +1,7 @@
+"""
+Микро-бенчмарки запросов SQLAlchemy из сравнений "Django vs SQLAlchemy" на моделях проекта.
+
+Запуск::
+
+    python -m benchmarks --sizes 1000,10000 --iterations 20 --output report.json
+"""
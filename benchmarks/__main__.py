@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import shutil
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import Base
+from app.models import Post, Tag, User
+from app.seed import SeedOptions, seed_database
+
+from .patterns import PATTERNS, STRATEGIES, BenchmarkContext
+from .runner import Measurement, run_async_suite, run_sync_suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк шаблонов запросов SQLAlchemy на моделях проекта")
+    parser.add_argument("--sizes", default="1000,10000", help="Количество постов в наборах данных через запятую")
+    parser.add_argument("--posts-per-user", type=int, default=10)
+    parser.add_argument("--tags", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--strategies", default=",".join(STRATEGIES), help="Стратегии загрузки связей через запятую")
+    parser.add_argument("--patterns", default="", help="Выполнить только указанные шаблоны (через запятую)")
+    parser.add_argument("--modes", default="sync,async", help="sync, async или оба")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Файл для отчета в формате JSON")
+    args = parser.parse_args()
+
+    strategies = _split(args.strategies)
+    if unknown := set(strategies) - set(STRATEGIES):
+        parser.error(f"unknown strategies: {', '.join(sorted(unknown))}")
+    patterns = PATTERNS
+    if names := _split(args.patterns):
+        patterns = [pattern for pattern in PATTERNS if pattern.name in names]
+    modes = _split(args.modes)
+    sizes = [int(value) for value in _split(args.sizes)]
+    # Шаблоны выбирают параметры запросов из существующих постов и пользователей
+    if any(size < 1 for size in sizes):
+        parser.error("--sizes must be at least 1")
+
+    results: list[Measurement] = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "benchmark.db"
+            engine = create_engine(f"sqlite:///{path}")
+            Base.metadata.create_all(engine)
+            options = SeedOptions(
+                users=max(1, size // args.posts_per_user), posts=size, tags=args.tags, seed=args.seed
+            )
+            seed_database(engine, options)
+            ctx = _build_context(engine, args.seed)
+            engine.dispose()
+
+            read_patterns = [pattern for pattern in patterns if not pattern.writes]
+            write_patterns = [pattern for pattern in patterns if pattern.writes]
+            results += _run_modes(path, modes, ctx, read_patterns, strategies, args.iterations, size)
+
+            # Шаблоны на запись изменяют данные, поэтому выполняются на отдельной копии базы для каждого режима.
+            # Так все шаблоны на чтение в обоих режимах измеряются на исходном наборе данных.
+            for mode in modes:
+                copy = Path(tmp) / f"benchmark-{mode}-writes.db"
+                shutil.copyfile(path, copy)
+                results += _run_modes(copy, [mode], ctx, write_patterns, strategies, args.iterations, size)
+
+    _print_table(results)
+    if args.output:
+        report = {
+            "environment": {
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "platform": platform.platform(),
+                "database": "sqlite",
+            },
+            "parameters": {key: str(value) for key, value in vars(args).items()},
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Report written to {args.output}")
+
+
+def _run_modes(
+    path: Path, modes: list[str], ctx, patterns, strategies, iterations: int, size: int
+) -> list[Measurement]:
+    results: list[Measurement] = []
+    if not patterns:
+        return results
+    if "sync" in modes:
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            results += run_sync_suite(engine, ctx, patterns, strategies, iterations, size)
+        finally:
+            engine.dispose()
+    if "async" in modes:
+        results += asyncio.run(_run_async(path, ctx, patterns, strategies, iterations, size))
+    return results
+
+
+async def _run_async(path: Path, ctx, patterns, strategies, iterations: int, size: int) -> list[Measurement]:
+    try:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    except ModuleNotFoundError:
+        print("aiosqlite is not installed, async benchmarks are skipped", file=sys.stderr)
+        return []
+    try:
+        return await run_async_suite(engine, ctx, patterns, strategies, iterations, size)
+    finally:
+        await engine.dispose()
+
+
+def _build_context(engine: Engine, seed: int) -> BenchmarkContext:
+    """
+    Выбирает из сгенерированных данных значения параметров для запросов.
+    """
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        # Первые пользователи и теги самые популярные: данные сгенерированы по распределению Ципфа
+        usernames = list(conn.scalars(select(User.username).order_by(User.id).limit(10)))
+        tag_names = list(conn.scalars(select(Tag.name).order_by(Tag.id).limit(2)))
+        post_ids = list(conn.scalars(select(Post.id)))
+        title = conn.scalar(select(Post.title).order_by(Post.id).limit(1))
+    return BenchmarkContext(
+        usernames=usernames,
+        post_ids=rng.sample(post_ids, min(len(post_ids), 100)),
+        tag_names=tag_names,
+        search_term=title.split()[0].lower() if title else "",
+    )
+
+
+def _print_table(results: list[Measurement]):
+    header = f"{'pattern':<24} {'mode':<6} {'strategy':<9} {'posts':>7} {'queries':>8} {'median ms':>10} {'p95 ms':>9} {'peak KiB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.pattern:<24} {r.mode:<6} {r.strategy or '-':<9} {r.dataset_posts:>7} {r.queries_per_iteration:>8.1f} "
+            f"{r.wall_ms['median']:>10.3f} {r.wall_ms['p95']:>9.3f} {r.peak_alloc_kib:>9.1f}"
+        )
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+if __name__ == "__main__":
+    main()
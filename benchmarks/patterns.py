@@ -0,0 +1,278 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy import Result, Select, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, lazyload, selectinload
+
+from app.models import Post, Tag, User
+from app.services.posts import _fetch_post_list_items, _select_post_list_rows
+
+# Стратегии загрузки связей, которые сравниваются в шаблонах со связанными объектами.
+# "select" - ленивая загрузка при обращении к атрибуту (поведение моделей по умолчанию).
+STRATEGIES: dict[str, Callable[..., Any]] = {
+    "select": lazyload,
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+
+
+@dataclass
+class BenchmarkContext:
+    """
+    Значения параметров запросов, существующие в сгенерированном наборе данных.
+    На каждой итерации берется следующее значение, чтобы запросы не повторялись буквально.
+    """
+
+    usernames: list[str]
+    post_ids: list[int]
+    tag_names: list[str]
+    search_term: str
+    counter: itertools.count = field(default_factory=itertools.count)
+
+    @staticmethod
+    def pick(values: Sequence[Any], iteration: int) -> Any:
+        return values[iteration % len(values)]
+
+
+@dataclass
+class Pattern:
+    name: str
+    # Документ и раздел, в котором описан шаблон
+    source: str
+    # Функции выполняют шаблон и возвращают количество полученных объектов или строк
+    run_sync: Callable[[Session, BenchmarkContext, int, str], int]
+    run_async: Callable[[AsyncSession, BenchmarkContext, int, str], Awaitable[int]]
+    # Зависит ли шаблон от стратегии загрузки связей
+    uses_strategy: bool = False
+    # Изменяет ли шаблон данные (такие шаблоны выполняются на копии базы)
+    writes: bool = False
+
+
+def _query_pattern(
+    name: str,
+    source: str,
+    build: Callable[[BenchmarkContext, int, str], Select],
+    fetch: str = "scalars",
+    touch: str | None = None,
+) -> Pattern:
+    """
+    Создает шаблон, выполняющий один запрос на чтение.
+
+    :param build: Функция, строящая запрос по контексту, номеру итерации и стратегии загрузки.
+    :param fetch: Способ получения результата: "scalars", "rows" или "scalar".
+    :param touch: Имя связи, к которой обращаются у каждого полученного объекта.
+    """
+
+    def run_sync(session: Session, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+        items = _fetch(session.execute(build(ctx, iteration, strategy)), fetch)
+        if touch:
+            _touch(items, touch)
+        return len(items)
+
+    async def run_async(session: AsyncSession, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+        items = _fetch(await session.execute(build(ctx, iteration, strategy)), fetch)
+        if touch:
+            # Ленивая загрузка в асинхронной сессии возможна только внутри `run_sync`
+            await session.run_sync(lambda _: _touch(items, touch))
+        return len(items)
+
+    return Pattern(name, source, run_sync, run_async, uses_strategy=touch is not None)
+
+
+def _fetch(result: Result, fetch: str) -> Sequence[Any]:
+    if fetch == "scalars":
+        # `unique()` обязателен для joinedload коллекций и ничего не меняет для остальных стратегий
+        return result.unique().scalars().all()
+    if fetch == "rows":
+        return result.all()
+    return [result.scalar_one()]
+
+
+def _touch(items: Sequence[Any], relationship: str):
+    for item in items:
+        len(getattr(item, relationship))
+
+
+# Шаблоны на чтение
+
+SYNC_DOC = "Django vs SQLAlchemy SYNC Queries"
+HARD_DOC = "Django vs SQLAlchemy HARD"
+
+
+def _lookup_one_field(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return select(User).filter_by(username=ctx.pick(ctx.usernames, i))
+
+
+def _filter_multiple_fields(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    username = ctx.pick(ctx.usernames, i)
+    return select(User).filter_by(username=username, email=f"{username}@example.com")
+
+
+def _many_to_many_get(ctx: BenchmarkContext, i: int, strategy: str) -> Select[tuple[Post]]:
+    return select(Post).where(Post.id == ctx.pick(ctx.post_ids, i)).options(STRATEGIES[strategy](Post.tags))
+
+
+def _one_to_many_get(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return (
+        select(User)
+        .filter_by(username=ctx.pick(ctx.usernames, i))
+        .options(STRATEGIES[strategy](User.posts))
+    )
+
+
+def _count(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return (
+        select(func.count(Post.id))
+        .join(User)
+        .where(User.username == ctx.pick(ctx.usernames, i))
+    )
+
+
+def _average(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return select(func.avg(func.length(Post.content)))
+
+
+def _annotate(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return (
+        select(User, func.count(Post.id).label("num_posts"))
+        .join(Post)
+        .group_by(User.id)
+        .having(func.count(Post.id) > 5)
+    )
+
+
+def _sort_limit(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return select(Post).order_by(Post.id.desc()).limit(10)
+
+
+def _join_filter(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return select(Post).join(User).where(User.username == ctx.pick(ctx.usernames, i))
+
+
+def _subquery(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    # Посты длиннее средней длины постов их автора
+    author = Post.__table__.alias("author_posts")
+    average = (
+        select(func.avg(func.length(author.c.content)))
+        .where(author.c.user_id == Post.user_id)
+        .scalar_subquery()
+    )
+    return (
+        select(Post)
+        .join(User)
+        .where(User.username == ctx.pick(ctx.usernames, i), func.length(Post.content) > average)
+    )
+
+
+def _or_icontains(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    term = ctx.search_term.lower()
+    return (
+        select(Post)
+        .filter(or_(func.lower(Post.title).contains(term), func.lower(Post.content).contains(term)))
+        .limit(100)
+        .options(STRATEGIES[strategy](Post.tags))
+    )
+
+
+def _projection_limit(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    # В моделях нет created_at, поэтому "последние" посты определяются по id
+    return select(Post.id, Post.title).order_by(Post.id.desc()).limit(100)
+
+
+def _posts_with_both_tags(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return (
+        select(Post)
+        .join(Post.tags)
+        .filter(Tag.name.in_(ctx.tag_names[:2]))
+        .group_by(Post.id)
+        .having(func.count(Tag.id) == 2)
+    )
+
+
+def _posts_list_with_tags(ctx: BenchmarkContext, i: int, strategy: str) -> Select:
+    return select(Post).order_by(Post.id).limit(100).options(STRATEGIES[strategy](Post.tags))
+
+
+def _posts_list_projection_sync(session: Session, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+    # Тот же запрос, что и в `get_posts_list`, но без кэша и с тем же лимитом, что и у ORM варианта
+    return len(_fetch_post_list_items(session, _select_post_list_rows(session).limit(100)))
+
+
+async def _posts_list_projection_async(
+    session: AsyncSession, ctx: BenchmarkContext, iteration: int, strategy: str
+) -> int:
+    return await session.run_sync(_posts_list_projection_sync, ctx, iteration, strategy)
+
+
+# Шаблоны на запись
+
+
+def _insert_sync(session: Session, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+    n = next(ctx.counter)
+    session.add(User(username=f"bench{n}", email=f"bench{n}@example.com", password="-"))
+    session.commit()
+    return 1
+
+
+async def _insert_async(session: AsyncSession, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+    n = next(ctx.counter)
+    session.add(User(username=f"bench{n}", email=f"bench{n}@example.com", password="-"))
+    await session.commit()
+    return 1
+
+
+def _many_to_many_add_sync(session: Session, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+    post = session.scalars(_many_to_many_get(ctx, iteration, strategy)).unique().one()
+    post.tags.append(Tag(name=f"bench-tag{next(ctx.counter)}"))
+    session.commit()
+    return 1
+
+
+async def _many_to_many_add_async(session: AsyncSession, ctx: BenchmarkContext, iteration: int, strategy: str) -> int:
+    post = (await session.scalars(_many_to_many_get(ctx, iteration, strategy))).unique().one()
+    tag = Tag(name=f"bench-tag{next(ctx.counter)}")
+    await session.run_sync(lambda _: post.tags.append(tag))
+    await session.commit()
+    return 1
+
+
+PATTERNS: list[Pattern] = [
+    _query_pattern("lookup_one_field", f"{SYNC_DOC}: Поиск по одному полю", _lookup_one_field),
+    _query_pattern("filter_multiple_fields", f"{SYNC_DOC}: Фильтрация по нескольким полям", _filter_multiple_fields),
+    Pattern("insert_record", f"{SYNC_DOC}: Добавление новой записи", _insert_sync, _insert_async, writes=True),
+    Pattern(
+        "many_to_many_add",
+        f"{SYNC_DOC}: Многие ко многим (добавление)",
+        _many_to_many_add_sync,
+        _many_to_many_add_async,
+        uses_strategy=True,
+        writes=True,
+    ),
+    _query_pattern("many_to_many_get", f"{SYNC_DOC}: Многие ко многим (получение)", _many_to_many_get, touch="tags"),
+    _query_pattern("one_to_many_get", f"{SYNC_DOC}: Один ко многим (получение)", _one_to_many_get, touch="posts"),
+    _query_pattern("count", f"{SYNC_DOC}: Агрегация (количество объектов)", _count, fetch="scalar"),
+    _query_pattern("average", f"{SYNC_DOC}: Агрегация (сумма, среднее)", _average, fetch="scalar"),
+    _query_pattern("annotate_having", f"{SYNC_DOC}: Сложная фильтрация с аннотацией", _annotate, fetch="rows"),
+    _query_pattern("sort_limit", f"{SYNC_DOC}: Поиск с сортировкой и лимитом", _sort_limit),
+    _query_pattern("join_filter", f"{SYNC_DOC}: Поиск с объединением таблиц", _join_filter),
+    _query_pattern("correlated_subquery", f"{SYNC_DOC}: Запрос с использованием подзапроса", _subquery),
+    _query_pattern(
+        "or_icontains", f"{HARD_DOC}: Фильтрация с выражением OR и игнорированием регистра", _or_icontains, touch="tags"
+    ),
+    _query_pattern("projection_limit", f"{HARD_DOC}: Поиск заметок без содержимого", _projection_limit, fetch="rows"),
+    _query_pattern("posts_with_both_tags", f"{HARD_DOC}: Получение всех заметок с двумя тегами", _posts_with_both_tags),
+    _query_pattern(
+        "posts_list_with_tags",
+        "app.services.posts.get_posts_list: исходный вариант с ORM объектами",
+        _posts_list_with_tags,
+        touch="tags",
+    ),
+    Pattern(
+        "posts_list_projection",
+        "app.services.posts.get_posts_list: колонки и теги, агрегированные в SQL",
+        _posts_list_projection_sync,
+        _posts_list_projection_async,
+    ),
+]
@@ -0,0 +1,164 @@
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from .patterns import BenchmarkContext, Pattern
+
+
+@dataclass
+class Measurement:
+    pattern: str
+    source: str
+    mode: str
+    # None для шаблонов, не зависящих от стратегии загрузки связей
+    strategy: str | None
+    dataset_posts: int
+    iterations: int
+    rows: int
+    queries_per_iteration: float
+    wall_ms: dict[str, float]
+    # Пиковый объем памяти, выделенной за одно выполнение шаблона
+    peak_alloc_kib: float
+
+
+class QueryCounter:
+    """
+    Считает SQL запросы, отправленные через движок.
+    """
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def run_sync_suite(
+    engine: Engine,
+    ctx: BenchmarkContext,
+    patterns: list[Pattern],
+    strategies: list[str],
+    iterations: int,
+    dataset_posts: int,
+) -> list[Measurement]:
+    """
+    Измеряет шаблоны в синхронной сессии. Каждая итерация выполняется в новой сессии,
+    чтобы identity map не скрывала запросы.
+    """
+    counter = QueryCounter(engine)
+    session_factory = sessionmaker(bind=engine)
+    results = []
+
+    for pattern in patterns:
+        pattern_strategies: list[str | None] = [*strategies] if pattern.uses_strategy else [None]
+        for strategy in pattern_strategies:
+
+            def run_once(iteration: int) -> int:
+                with session_factory() as session:
+                    return pattern.run_sync(session, ctx, iteration, strategy or "select")
+
+            # Первое выполнение заполняет кэш скомпилированных запросов и не учитывается
+            run_once(0)
+
+            counter.count = 0
+            timings = []
+            rows = 0
+            for iteration in range(iterations):
+                start = time.perf_counter()
+                rows = run_once(iteration)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = counter.count / iterations
+
+            # Память измеряется отдельным выполнением: tracemalloc сильно замедляет код
+            tracemalloc.start()
+            run_once(iterations)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results.append(
+                _measurement(pattern, "sync", strategy, dataset_posts, iterations, rows, queries, timings, peak)
+            )
+    return results
+
+
+async def run_async_suite(
+    engine: AsyncEngine,
+    ctx: BenchmarkContext,
+    patterns: list[Pattern],
+    strategies: list[str],
+    iterations: int,
+    dataset_posts: int,
+) -> list[Measurement]:
+    """
+    То же, что и `run_sync_suite`, но в асинхронной сессии.
+    """
+    counter = QueryCounter(engine.sync_engine)
+    session_factory = async_sessionmaker(bind=engine)
+    results = []
+
+    for pattern in patterns:
+        pattern_strategies: list[str | None] = [*strategies] if pattern.uses_strategy else [None]
+        for strategy in pattern_strategies:
+
+            async def run_once(iteration: int) -> int:
+                async with session_factory() as session:
+                    return await pattern.run_async(session, ctx, iteration, strategy or "select")
+
+            await run_once(0)
+
+            counter.count = 0
+            timings = []
+            rows = 0
+            for iteration in range(iterations):
+                start = time.perf_counter()
+                rows = await run_once(iteration)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries = counter.count / iterations
+
+            tracemalloc.start()
+            await run_once(iterations)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results.append(
+                _measurement(pattern, "async", strategy, dataset_posts, iterations, rows, queries, timings, peak)
+            )
+    return results
+
+
+def _measurement(
+    pattern: Pattern,
+    mode: str,
+    strategy: str | None,
+    dataset_posts: int,
+    iterations: int,
+    rows: int,
+    queries: float,
+    timings: list[float],
+    peak_bytes: int,
+) -> Measurement:
+    ordered = sorted(timings)
+    return Measurement(
+        pattern=pattern.name,
+        source=pattern.source,
+        mode=mode,
+        strategy=strategy,
+        dataset_posts=dataset_posts,
+        iterations=iterations,
+        rows=rows,
+        queries_per_iteration=queries,
+        wall_ms={
+            "mean": statistics.fmean(ordered),
+            "median": statistics.median(ordered),
+            "min": ordered[0],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        },
+        peak_alloc_kib=peak_bytes / 1024,
+    )
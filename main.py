@@ -1,10 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.handlers import auth, posts
+from app.handlers import auth, health, posts, users
+from app.middlewares.idempotency import IdempotencyMiddleware
+from app.services.group_commit import group_commit_writer
+from app.services.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Прогрев выполняется в отдельном потоке: пока он идет, воркер отвечает на /health/live,
+    # а /health/ready возвращает 503, и балансировщик не направляет на него трафик.
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    await warm_up_task
+    # Дожидаемся записи операций, уже поставленных в очередь писателя
+    group_commit_writer.stop()
+
 
 # Создаем экземпляр FastAPI для нашего веб-приложения
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Повторы POST запросов с заголовком Idempotency-Key получают сохраненный ответ первого запроса
+app.add_middleware(IdempotencyMiddleware, paths=["/api/v1/posts", "/api/v1/auth/users"])
 
 # Подключаем роутер из модуля auth к основному приложению
 # Все маршруты из auth.router будут доступны с префиксом "/api/v1"
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(posts.router, prefix="/api/v1")
+app.include_router(users.router, prefix="/api/v1")
+app.include_router(health.router)